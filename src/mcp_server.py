@@ -11,6 +11,14 @@ import logging
 from typing import Dict, Any, List, Callable
 from pathlib import Path
 
+# orjsonが利用可能なら高速なJSONシリアライザとして使用します（任意依存）
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 
 class MCPServer:
     """
@@ -65,6 +73,29 @@ class MCPServer:
         self.tool_handlers[name] = handler
         self.logger.info(f"ツール '{name}' を登録しました")
 
+    def register_tools_bulk(self, specs: List[Dict[str, Any]]):
+        """複数のツールを一括登録します。
+
+        specsの各要素は変更せず、登録用のディクショナリを一度の
+        update呼び出しでまとめて書き込みます。
+
+        Args:
+            specs: ツール定義のリスト
+                （name, description, inputSchema, handlerを含むディクショナリ）
+        """
+        self.tools.update(
+            {
+                spec["name"]: {
+                    "name": spec["name"],
+                    "description": spec["description"],
+                    "inputSchema": spec["inputSchema"],
+                }
+                for spec in specs
+            }
+        )
+        self.tool_handlers.update({spec["name"]: spec["handler"] for spec in specs})
+        self.logger.info(f"{len(specs)}個のツールを一括登録しました")
+
     def start(self, server_name: str = "mcp-server-python", version: str = "0.1.0", description: str = "Python MCP Server"):
         """
         サーバーを起動し、stdioからのリクエストをリッスンします。
@@ -237,8 +268,15 @@ class MCPServer:
         Args:
             response: レスポンス
         """
-        response_json = json.dumps(response)
-        print(response_json, flush=True)
+        if _HAS_ORJSON:
+            # orjsonはbytesを返すため、標準出力のバッファに直接書き込む
+            response_bytes = orjson.dumps(response)
+            sys.stdout.buffer.write(response_bytes + b"\n")
+            sys.stdout.buffer.flush()
+            response_json = response_bytes.decode("utf-8")
+        else:
+            response_json = json.dumps(response)
+            print(response_json, flush=True)
         self.logger.info(f"レスポンスを送信しました: {response_json}")
 
     def _get_tools(self) -> List[Dict[str, Any]]:
@@ -6,11 +6,32 @@ MIDIファイルやMIDIデータの演奏機能を提供します。
 """
 
 import time
+import struct
 import threading
 from typing import List, Optional, Dict, Any
 import mido
 import rtmidi
 
+# ポート列挙専用のrtmidi.MidiOutインスタンス（遅延生成して再利用する）
+_ENUM_MIDI_OUT = None
+_ENUM_LOCK = threading.Lock()
+
+
+def _enum_midi_out() -> "rtmidi.MidiOut":
+    """ポート列挙用のMidiOutインスタンスを返します。
+
+    呼び出しのたびにネイティブオブジェクトを生成するのを避けるため、
+    ロックで保護したモジュールレベルのインスタンスを共有します。
+
+    Returns:
+        rtmidi.MidiOut: 列挙専用のMidiOutインスタンス
+    """
+    global _ENUM_MIDI_OUT
+    with _ENUM_LOCK:
+        if _ENUM_MIDI_OUT is None:
+            _ENUM_MIDI_OUT = rtmidi.MidiOut()
+        return _ENUM_MIDI_OUT
+
 
 class MIDIPlayer:
     """MIDIプレイヤークラス
@@ -29,6 +50,16 @@ class MIDIPlayer:
         self.is_playing = False
         self.play_thread = None
 
+        # 演奏スレッドへの停止要求フラグ
+        self._stop_event = threading.Event()
+
+        # 全チャンネル分のAll Notes Off / All Sound Offメッセージを事前に構築
+        # （停止のたびにリストを作り直さないようにする）
+        self._all_off_msgs = tuple(bytes((0xB0 | channel, control, 0)) for control in (123, 120) for channel in range(16))
+
+        # ポート一覧のキャッシュ（取得時刻, ポートのリスト）
+        self._ports_cache = (0.0, [])
+
         # MIDIアウトポートを初期化
         self._initialize_midi_output()
 
@@ -61,6 +92,31 @@ class MIDIPlayer:
         except Exception as e:
             raise RuntimeError(f"MIDI出力の初期化に失敗しました: {str(e)}")
 
+    def _ports(self, ttl: float = 1.0) -> List[str]:
+        """ポート一覧を短いTTL付きキャッシュ経由で取得します。
+
+        rtmidi.MidiOutの生成はネイティブオブジェクトの構築を伴うため、
+        開いているポートがあればそれを再利用し、結果をTTLの間キャッシュします。
+
+        Args:
+            ttl (float): キャッシュの有効期間（秒）
+
+        Returns:
+            List[str]: 利用可能なMIDIデバイス名のリスト
+        """
+        timestamp, ports = self._ports_cache
+        now = time.perf_counter()
+        if now - timestamp < ttl:
+            return ports
+
+        if self.midi_out is not None:
+            ports = self.midi_out.get_ports()
+        else:
+            ports = _enum_midi_out().get_ports()
+
+        self._ports_cache = (now, ports)
+        return ports
+
     def get_available_devices(self) -> List[str]:
         """利用可能なMIDIデバイスの一覧を取得します。
 
@@ -68,8 +124,25 @@ class MIDIPlayer:
             List[str]: 利用可能なMIDIデバイス名のリスト
         """
         try:
-            midi_out = rtmidi.MidiOut()
-            return midi_out.get_ports()
+            return self._ports()
+        except Exception as e:
+            raise RuntimeError(f"MIDIデバイス一覧の取得に失敗しました: {str(e)}")
+
+    @classmethod
+    def list_devices_static(cls) -> List[str]:
+        """ポートを開かずに利用可能なMIDIデバイスの一覧を取得します。
+
+        インスタンスを生成しないため、列挙のためだけにMIDIデバイスを
+        オープンすることがありません。
+
+        Returns:
+            List[str]: 利用可能なMIDIデバイス名のリスト
+
+        Raises:
+            RuntimeError: デバイス一覧の取得に失敗した場合
+        """
+        try:
+            return _enum_midi_out().get_ports()
         except Exception as e:
             raise RuntimeError(f"MIDIデバイス一覧の取得に失敗しました: {str(e)}")
 
@@ -103,15 +176,121 @@ class MIDIPlayer:
             RuntimeError: 演奏エラーの場合
         """
         try:
-            # バイトデータからMIDIファイルオブジェクトを作成
-            import io
-
-            midi_file = mido.MidiFile(file=io.BytesIO(midi_data))
-            self.play_midi_data_from_file(midi_file)
+            # SMFバイト列を直接解析して演奏イベントに展開する
+            # （io.BytesIO + mido.MidiFileの往復を省く）
+            events = self._parse_smf_events(midi_data)
+            self._start_playback(events)
 
         except Exception as e:
             raise RuntimeError(f"MIDIデータ演奏エラー: {str(e)}")
 
+    @staticmethod
+    def _parse_smf_events(midi_data: bytes) -> List[tuple]:
+        """SMFバイト列を（絶対時刻[秒], 送信バイト列）のリストに展開します。
+
+        MThd/MTrkチャンクとVLQデルタタイムを直接読み取り、
+        テンポマップを適用して秒単位の絶対時刻を計算します。
+        メッセージごとのオブジェクト生成を行いません。
+
+        Args:
+            midi_data (bytes): SMF形式のMIDIデータ
+
+        Returns:
+            List[tuple]: (絶対時刻[秒], 送信バイト列) のリスト
+
+        Raises:
+            ValueError: SMF形式が不正な場合
+        """
+        if midi_data[:4] != b"MThd":
+            raise ValueError("MThdヘッダーがありません")
+
+        header_len = int.from_bytes(midi_data[4:8], "big")
+        division = struct.unpack(">HHH", midi_data[8:14])[2]
+        if division & 0x8000:
+            raise ValueError("SMPTE形式のdivisionには対応していません")
+
+        # 各トラックを（絶対ティック, テンポかどうか, ペイロード）に展開
+        merged = []
+        pos = 8 + header_len
+        while pos < len(midi_data):
+            if midi_data[pos : pos + 4] != b"MTrk":
+                raise ValueError(f"MTrkヘッダーがありません: 位置 {pos}")
+            track_len = int.from_bytes(midi_data[pos + 4 : pos + 8], "big")
+            p = pos + 8
+            end = p + track_len
+            abs_ticks = 0
+            status = 0
+
+            while p < end:
+                # デルタタイム（VLQ）
+                delta = 0
+                byte = midi_data[p]
+                while byte & 0x80:
+                    delta = (delta << 7) | (byte & 0x7F)
+                    p += 1
+                    byte = midi_data[p]
+                delta = (delta << 7) | byte
+                p += 1
+                abs_ticks += delta
+
+                byte = midi_data[p]
+                if byte == 0xFF:
+                    # メタイベント（テンポのみ演奏に反映）
+                    meta_type = midi_data[p + 1]
+                    p += 2
+                    meta_len = 0
+                    byte = midi_data[p]
+                    while byte & 0x80:
+                        meta_len = (meta_len << 7) | (byte & 0x7F)
+                        p += 1
+                        byte = midi_data[p]
+                    meta_len = (meta_len << 7) | byte
+                    p += 1
+                    if meta_type == 0x51:
+                        merged.append((abs_ticks, True, int.from_bytes(midi_data[p : p + 3], "big")))
+                    p += meta_len
+                elif byte in (0xF0, 0xF7):
+                    # SysExイベント
+                    p += 1
+                    sysex_len = 0
+                    b2 = midi_data[p]
+                    while b2 & 0x80:
+                        sysex_len = (sysex_len << 7) | (b2 & 0x7F)
+                        p += 1
+                        b2 = midi_data[p]
+                    sysex_len = (sysex_len << 7) | b2
+                    p += 1
+                    merged.append((abs_ticks, False, bytes((byte,)) + midi_data[p : p + sysex_len]))
+                    p += sysex_len
+                else:
+                    # チャンネルメッセージ（ランニングステータス対応）
+                    if byte & 0x80:
+                        status = byte
+                        p += 1
+                    data_len = 1 if status & 0xF0 in (0xC0, 0xD0) else 2
+                    merged.append((abs_ticks, False, bytes((status,)) + midi_data[p : p + data_len]))
+                    p += data_len
+
+            pos = end
+
+        # トラックを統合し、テンポマップを適用して秒に変換
+        merged.sort(key=lambda item: item[0])
+
+        events = []
+        seconds = 0.0
+        last_ticks = 0
+        microseconds_per_beat = 500000  # デフォルトテンポ（120 BPM）
+
+        for abs_ticks, is_tempo, payload in merged:
+            seconds += (abs_ticks - last_ticks) * microseconds_per_beat / (division * 1000000.0)
+            last_ticks = abs_ticks
+            if is_tempo:
+                microseconds_per_beat = payload
+            else:
+                events.append((seconds, payload))
+
+        return events
+
     def play_midi_data_from_file(self, midi_file: mido.MidiFile) -> None:
         """MIDIファイルオブジェクトを演奏します。
 
@@ -121,38 +300,99 @@ class MIDIPlayer:
         Raises:
             RuntimeError: 演奏エラーの場合
         """
+        # 演奏開始前にメッセージを（絶対時刻, 生バイト列）へ展開しておく
+        # （演奏ループ中のオブジェクト生成をなくし、ジッタを抑える）
+        events = self._flatten_midi_events(midi_file)
+        self._start_playback(events)
+
+    def _start_playback(self, events: List[tuple]) -> None:
+        """展開済みイベントの演奏をバックグラウンドスレッドで開始します。
+
+        Args:
+            events (List[tuple]): (絶対時刻[秒], 送信バイト列) のリスト
+        """
         if self.is_playing:
             self.stop()
 
+        self._stop_event.clear()
         self.is_playing = True
 
         # 別スレッドで演奏を開始
-        self.play_thread = threading.Thread(target=self._play_midi_thread, args=(midi_file,))
+        self.play_thread = threading.Thread(target=self._play_events_thread, args=(events,))
         self.play_thread.daemon = True
         self.play_thread.start()
 
-    def _play_midi_thread(self, midi_file: mido.MidiFile) -> None:
-        """MIDIファイルを演奏するスレッド関数。
+    @staticmethod
+    def _flatten_midi_events(midi_file: mido.MidiFile) -> List[tuple]:
+        """MIDIファイルを（絶対時刻, 生バイト列）のリストに展開します。
+
+        テンポを考慮した秒単位の絶対時刻を前計算し、メタメッセージを
+        除いた送信バイト列を先に用意することで、演奏ループを
+        待機と送信だけにします。
 
         Args:
             midi_file (mido.MidiFile): MIDIファイルオブジェクト
+
+        Returns:
+            List[tuple]: (絶対時刻[秒], 送信バイト列) のリスト
+        """
+        events = []
+        abs_time = 0.0
+        # MidiFileのイテレーションは全トラックを統合し、msg.timeを秒で返す
+        for msg in midi_file:
+            abs_time += msg.time
+            if not msg.is_meta:
+                events.append((abs_time, bytes(msg.bytes())))
+        return events
+
+    @staticmethod
+    def _wait_until(deadline: float) -> None:
+        """perf_counter基準の絶対時刻まで待機します。
+
+        time.sleepのジッタを吸収するため、締め切りの1ms手前まで
+        sleepし、残りはスピンウェイトで精度を確保します。
+
+        Args:
+            deadline (float): time.perf_counter基準の締め切り時刻
+        """
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            if remaining > 0.002:
+                time.sleep(remaining - 0.001)
+            else:
+                # 最後の数msはスピンして精度を確保
+                while time.perf_counter() < deadline:
+                    pass
+                return
+
+    def _play_events_thread(self, events: List[tuple]) -> None:
+        """展開済みイベントを演奏するスレッド関数。
+
+        各メッセージの締め切りを演奏開始時刻からの絶対時刻として
+        計算するため、メッセージごとのsleep誤差が累積しません。
+
+        Args:
+            events (List[tuple]): (絶対時刻[秒], 送信バイト列) のリスト
         """
         try:
             if not self.midi_out:
                 raise RuntimeError("MIDI出力が初期化されていません")
 
-            # 全てのトラックを統合して演奏
-            for msg in midi_file.play():
-                if not self.is_playing:
+            # 属性参照をループ外でローカル変数に束縛する
+            send = self.midi_out.send_message
+            stop_requested = self._stop_event.is_set
+            start = time.perf_counter()
+
+            for offset, raw in events:
+                if stop_requested():
                     break
 
-                # メタメッセージ以外のMIDIメッセージを送信
-                if not msg.is_meta:
-                    self.midi_out.send_message(msg.bytes())
+                if offset > 0:
+                    self._wait_until(start + offset)
 
-                # 必要に応じて待機
-                if hasattr(msg, "time") and msg.time > 0:
-                    time.sleep(msg.time)
+                send(raw)
 
             # 演奏終了後、全ての音を停止
             self._send_all_notes_off()
@@ -166,20 +406,15 @@ class MIDIPlayer:
         """全てのチャンネルで全ての音符をオフにします。"""
         try:
             if self.midi_out:
-                # 全チャンネルでAll Notes Offを送信
-                for channel in range(16):
-                    # All Notes Off (CC 123)
-                    all_notes_off = [0xB0 + channel, 123, 0]
-                    self.midi_out.send_message(all_notes_off)
-
-                    # All Sound Off (CC 120)
-                    all_sound_off = [0xB0 + channel, 120, 0]
-                    self.midi_out.send_message(all_sound_off)
+                # 全チャンネルでAll Notes Off (CC 123) / All Sound Off (CC 120) を送信
+                for message in self._all_off_msgs:
+                    self.midi_out.send_message(message)
         except Exception as e:
             print(f"All Notes Off送信中にエラーが発生しました: {str(e)}")
 
     def stop(self) -> None:
         """演奏を停止します。"""
+        self._stop_event.set()
         self.is_playing = False
 
         # 演奏スレッドの終了を待機
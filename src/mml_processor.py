@@ -6,10 +6,411 @@ MMLテキストの解析、MIDI変換、バリデーション機能を提供し
 """
 
 import re
-import io
-from typing import Tuple
-from music21 import stream, note, duration, tempo, meter, key
-import mido
+import os
+import struct
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from music21 import stream
+
+# 空白除去用の正規表現（呼び出しごとのコンパイルを避けるためモジュールレベルで事前コンパイル）
+_WS_RE = re.compile(r"\s+")
+
+# 音名からオクターブ内の半音オフセットへの変換テーブル
+_NOTE_OFFSET = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+
+
+def _clamp_midi(value: int) -> int:
+    """MIDIノート番号を0-127の範囲にオクターブ単位で収めます。
+
+    music21のpitch.midiと同様に、上限を超える音高は1オクターブずつ
+    下げて有効範囲に移調します（例: O9B → 119）。SMFのデータバイトは
+    0-127が上限のため、範囲外の値はファイルを壊してしまいます。
+
+    Args:
+        value (int): 移調前のノート番号
+
+    Returns:
+        int: 0-127に収めたノート番号
+    """
+    while value > 127:
+        value -= 12
+    return value
+
+
+# (音名, 臨時記号, オクターブ) からMIDIノート番号への変換テーブル
+# インポート時に全組み合わせを展開し、トークナイザでは辞書引き1回にする
+_PITCH_TO_MIDI = {
+    (letter, acc, octave): _clamp_midi((octave + 1) * 12 + base + delta)
+    for octave in range(10)
+    for letter, base in _NOTE_OFFSET.items()
+    for acc, delta in (("", 0), ("#", 1), ("+", 1), ("-", -1))
+}
+
+# 音長から4分音符基準の長さへの変換テーブル（よく使う音長は除算を省略）
+_LEN_TO_QL = {1: 4.0, 2: 2.0, 4: 1.0, 8: 0.5, 16: 0.25, 32: 0.125, 64: 0.0625}
+
+# 付点の数に対する音長倍率テーブル（1.5を繰り返し掛ける代わりに1回の乗算で済ませる）
+_DOT_MULT = [1.0, 1.5, 1.75, 1.875, 1.9375]
+
+# 4分音符あたりのティック数（SMFのdivision）
+_TICKS_PER_BEAT = 480
+
+# (音長, 付点数) からティック数への変換テーブル
+# 音符ごとの浮動小数点乗算を辞書引きに置き換える
+_TICKS = {
+    (length, dots): int(quarter_length * _DOT_MULT[dots] * _TICKS_PER_BEAT)
+    for length, quarter_length in _LEN_TO_QL.items()
+    for dots in range(5)
+}
+
+# デフォルトベロシティ
+_VELOCITY = 64
+
+# SMF組み立て用のスレッドローカルな作業バッファ
+# 変換のたびにbytearrayを確保し直さず、空にリセットして再利用する
+_buf_local = threading.local()
+
+
+def _get_buf() -> bytearray:
+    """空にリセット済みのスレッドローカル作業バッファを返します。
+
+    Returns:
+        bytearray: 再利用可能な作業バッファ
+    """
+    buf = getattr(_buf_local, "buf", None)
+    if buf is None:
+        buf = _buf_local.buf = bytearray()
+    else:
+        del buf[:]
+    return buf
+
+
+# マルチトラック解析用の共有スレッドプール（初回使用時に生成）
+# 呼び出しごとにプールを作り直すとスレッド生成コストがかかるため再利用する
+_track_pool = None
+
+
+def _get_track_pool() -> ThreadPoolExecutor:
+    """トラック解析用の共有スレッドプールを返します。
+
+    Returns:
+        ThreadPoolExecutor: 共有のスレッドプール
+    """
+    global _track_pool
+    if _track_pool is None:
+        _track_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="mml-track")
+    return _track_pool
+
+
+def _append_vlq(buf: bytearray, value: int) -> None:
+    """可変長数値（VLQ）をエンコードしてバッファに追記します。
+
+    Args:
+        buf (bytearray): 追記先バッファ
+        value (int): エンコードする非負整数
+    """
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.extend(reversed(encoded))
+
+
+def _append_track(
+    track: bytearray, events: tuple, channel: int, initial_tempo: int, emit_tempo: bool, track_name: str = None
+) -> None:
+    """イベント列から1トラック分のMTrkチャンクを既存バッファへ追記します。
+
+    mido.Messageオブジェクトを介さず、デルタタイムのVLQエンコードと
+    ステータスバイトを直接bytearrayへ書き出します。中間バッファは
+    作らず、チャンク長はプレースホルダをstruct.pack_intoで埋めます。
+
+    Args:
+        track (bytearray): 追記先バッファ
+        events (tuple): _tokenize_mmlが返すイベント列
+        channel (int): MIDIチャンネル番号
+        initial_tempo (int): 先頭に書き込むテンポ（BPM）
+        emit_tempo (bool): テンポメタイベントを書き込むかどうか
+        track_name (str, optional): トラック名メタイベント
+    """
+    # チャンクヘッダー（長さは後で埋める）
+    chunk_start = len(track)
+    track.extend(b"MTrk\x00\x00\x00\x00")
+
+    # トラック名を設定
+    if track_name is not None:
+        name_bytes = track_name.encode("ascii")
+        _append_vlq(track, 0)
+        track.extend((0xFF, 0x03, len(name_bytes)))
+        track.extend(name_bytes)
+
+    current_time = 0
+
+    # 先頭のテンポ設定
+    if emit_tempo:
+        _append_vlq(track, 0)
+        track.extend((0xFF, 0x51, 0x03))
+        track.extend(int(60000000 / initial_tempo).to_bytes(3, "big"))
+
+    note_on = 0x90 | channel
+    note_off = 0x80 | channel
+
+    # ループ内の属性・グローバル参照をローカル変数に束縛する
+    extend = track.extend
+    append_vlq = _append_vlq
+    velocity = _VELOCITY
+
+    for event in events:
+        kind = event[0]
+        if kind == "note":
+            # 音符の処理（Note On / Note Off）
+            midi_note = event[2]
+
+            append_vlq(track, current_time)
+            extend((note_on, midi_note, velocity))
+            append_vlq(track, event[3])
+            extend((note_off, midi_note, velocity))
+
+            current_time = 0  # 次のイベントまでの時間をリセット
+
+        elif kind == "rest":
+            # 休符の処理
+            current_time += event[1]
+
+        elif emit_tempo:
+            # テンポ変更
+            append_vlq(track, current_time)
+            extend((0xFF, 0x51, 0x03))
+            extend(int(60000000 / event[1]).to_bytes(3, "big"))
+            current_time = 0
+
+    # End of Track
+    _append_vlq(track, 0)
+    track.extend((0xFF, 0x2F, 0x00))
+
+    # チャンク長を埋める
+    struct.pack_into(">I", track, chunk_start + 4, len(track) - chunk_start - 8)
+
+
+def _scan_int(data: bytes, i: int):
+    """位置iから連続する数字を読み取ります。
+
+    Args:
+        data (bytes): ASCIIバイト列
+        i (int): 読み取り開始位置
+
+    Returns:
+        tuple: (読み取った整数またはNone, 次の位置)
+    """
+    start = i
+    n = len(data)
+    while i < n and 0x30 <= data[i] <= 0x39:  # '0'-'9'
+        i += 1
+    return (int(data[start:i]) if i > start else None), i
+
+
+def _handle_note(data: bytes, i: int, state: list, events: list) -> int:
+    """音符コマンドを処理します。"""
+    letter = chr(data[i])
+    i += 1
+    n = len(data)
+
+    # シャープ・フラットの処理
+    acc = ""
+    suffix = ""
+    if i < n:
+        byte = data[i]
+        if byte == 0x23 or byte == 0x2B:  # '#' '+'
+            acc = chr(byte)
+            suffix = "#"
+            i += 1
+        elif byte == 0x2D:  # '-'
+            acc = "-"
+            suffix = "b"
+            i += 1
+
+    # 音長の処理
+    value, i = _scan_int(data, i)
+    note_length = value if value is not None else state[1]
+
+    # ドットの処理（付点音符）
+    dots = 0
+    while i < n and data[i] == 0x2E:  # '.'
+        dots += 1
+        i += 1
+
+    octave = state[0]
+
+    # MIDIノート番号を取得（C4 = 60）
+    midi_note = _PITCH_TO_MIDI[(letter, acc, octave)]
+
+    # 音長をティック数に変換（テーブルにない音長のみ計算する）
+    ticks = _TICKS.get((note_length, min(dots, 4)))
+    if ticks is None:
+        ticks = int(4.0 / note_length * _DOT_MULT[min(dots, 4)] * _TICKS_PER_BEAT)
+
+    events.append(("note", f"{letter}{suffix}{octave}", midi_note, ticks))
+    return i
+
+
+def _handle_rest(data: bytes, i: int, state: list, events: list) -> int:
+    """休符コマンドを処理します。"""
+    i += 1
+    n = len(data)
+
+    # 音長の処理
+    value, i = _scan_int(data, i)
+    rest_length = value if value is not None else state[1]
+
+    # ドットの処理
+    dots = 0
+    while i < n and data[i] == 0x2E:  # '.'
+        dots += 1
+        i += 1
+
+    # 音長をティック数に変換（テーブルにない音長のみ計算する）
+    ticks = _TICKS.get((rest_length, min(dots, 4)))
+    if ticks is None:
+        ticks = int(4.0 / rest_length * _DOT_MULT[min(dots, 4)] * _TICKS_PER_BEAT)
+
+    events.append(("rest", ticks))
+    return i
+
+
+def _handle_octave(data: bytes, i: int, state: list, events: list) -> int:
+    """オクターブ設定コマンドを処理します。"""
+    i += 1
+    if i >= len(data) or not 0x30 <= data[i] <= 0x39:
+        raise ValueError(f"オクターブ指定が不正です: 位置 {i}")
+    state[0] = data[i] - 0x30
+    return i + 1
+
+
+def _handle_length(data: bytes, i: int, state: list, events: list) -> int:
+    """デフォルト音長設定コマンドを処理します。"""
+    value, next_i = _scan_int(data, i + 1)
+    if value is None:
+        raise ValueError(f"音長指定が不正です: 位置 {i + 1}")
+    state[1] = value
+    return next_i
+
+
+def _handle_tempo(data: bytes, i: int, state: list, events: list) -> int:
+    """テンポ設定コマンドを処理します。"""
+    value, next_i = _scan_int(data, i + 1)
+    if value is None:
+        raise ValueError(f"テンポ指定が不正です: 位置 {i + 1}")
+    events.append(("tempo", value))
+    return next_i
+
+
+def _handle_octave_up(data: bytes, i: int, state: list, events: list) -> int:
+    """オクターブ上げコマンドを処理します。"""
+    state[0] = min(state[0] + 1, 8)
+    return i + 1
+
+
+def _handle_octave_down(data: bytes, i: int, state: list, events: list) -> int:
+    """オクターブ下げコマンドを処理します。"""
+    state[0] = max(state[0] - 1, 0)
+    return i + 1
+
+
+def _build_dispatch() -> list:
+    """バイト値からハンドラへの256エントリのディスパッチテーブルを構築します。"""
+    table = [None] * 256
+    for byte in b"ABCDEFG":
+        table[byte] = _handle_note
+    table[ord("R")] = _handle_rest
+    table[ord("O")] = _handle_octave
+    table[ord("L")] = _handle_length
+    table[ord("T")] = _handle_tempo
+    table[ord(">")] = _handle_octave_up
+    table[ord("<")] = _handle_octave_down
+    return table
+
+
+_DISPATCH = _build_dispatch()
+
+
+@functools.lru_cache(maxsize=256)
+def _tokenize_mml(mml_text: str, default_octave: int, default_length: int) -> tuple:
+    """MMLテキストを解析してイベントのタプルに変換します。
+
+    純粋関数としてモジュールレベルに置き、同一入力の再解析を
+    lru_cacheで省略します。戻り値は不変のタプルです。
+
+    Args:
+        mml_text (str): MMLテキスト
+        default_octave (int): デフォルトオクターブ
+        default_length (int): デフォルト音長
+
+    Returns:
+        tuple: イベントのタプル
+
+    Raises:
+        ValueError: MML構文エラーの場合
+    """
+    # MMLテキストの前処理（空白、改行を除去）
+    mml_text = _WS_RE.sub("", mml_text.upper())
+
+    # ASCIIバイト列に変換し、バイト値でディスパッチする
+    try:
+        data = mml_text.encode("ascii")
+    except UnicodeEncodeError:
+        for index, char in enumerate(mml_text):
+            if ord(char) > 0x7F:
+                raise ValueError(f"不明なMMLコマンド: '{char}' 位置 {index}")
+
+    # 状態は [現在のオクターブ, 現在のデフォルト音長]
+    state = [default_octave, default_length]
+    events = []
+
+    dispatch = _DISPATCH
+    i = 0
+    n = len(data)
+    while i < n:
+        handler = dispatch[data[i]]
+        if handler is None:
+            # ディスパッチテーブルにないバイト＝不明なコマンド
+            raise ValueError(f"不明なMMLコマンド: '{mml_text[i]}' 位置 {i}")
+        i = handler(data, i, state, events)
+
+    return tuple(events)
+
+
+@functools.lru_cache(maxsize=256)
+def _mml_to_midi_bytes(mml_text: str, default_octave: int, default_length: int, default_tempo: int) -> bytes:
+    """MMLテキストをMIDIデータ（バイト列）に変換します。
+
+    解析から書き出しまでを純粋関数としてまとめ、同一入力の
+    変換結果をlru_cacheで再利用します。
+
+    Args:
+        mml_text (str): MMLテキスト
+        default_octave (int): デフォルトオクターブ
+        default_length (int): デフォルト音長
+        default_tempo (int): デフォルトテンポ
+
+    Returns:
+        bytes: MIDIデータ
+
+    Raises:
+        ValueError: MML構文エラーの場合
+    """
+    # MMLをイベント列に変換（music21を経由しない）
+    events = _tokenize_mml(mml_text, default_octave, default_length)
+
+    # SMFのヘッダーとトラックを再利用バッファに直接組み立てる
+    midi_data = _get_buf()
+    midi_data.extend(b"MThd" + struct.pack(">IHHH", 6, 1, 1, _TICKS_PER_BEAT))
+    _append_track(midi_data, events, channel=0, initial_tempo=default_tempo, emit_tempo=True)
+    return bytes(midi_data)
 
 
 class MMLProcessor:
@@ -24,7 +425,36 @@ class MMLProcessor:
         self.default_length = 4  # 4分音符
         self.default_tempo = 120
 
-    def parse_mml(self, mml_text: str) -> stream.Stream:
+    def _mml_to_events(self, mml_text: str) -> tuple:
+        """MMLテキストを解析して軽量なイベントのタプルに変換します。
+
+        music21のオブジェクトを生成せず、MIDI変換に必要な情報だけを
+        タプルで保持します。イベントは以下のいずれかです。
+
+        - ("note", pitch_name, midi_note, duration_ticks)
+        - ("rest", duration_ticks)
+        - ("tempo", bpm)
+
+        結果は入力テキストとデフォルト設定をキーにキャッシュされます。
+
+        Args:
+            mml_text (str): MMLテキスト
+
+        Returns:
+            tuple: イベントのタプル
+
+        Raises:
+            ValueError: MML構文エラーの場合
+        """
+        return _tokenize_mml(mml_text, self.default_octave, self.default_length)
+
+    @staticmethod
+    def clear_cache() -> None:
+        """解析・変換結果のキャッシュをクリアします。"""
+        _tokenize_mml.cache_clear()
+        _mml_to_midi_bytes.cache_clear()
+
+    def parse_mml(self, mml_text: str) -> "stream.Stream":
         """MMLテキストを解析してmusic21のStreamオブジェクトに変換します。
 
         Args:
@@ -36,20 +466,19 @@ class MMLProcessor:
         Raises:
             ValueError: MML構文エラーの場合
         """
+        # music21のインポートは重い（数百ms）ため、Streamが必要になる
+        # このメソッドの中まで遅延させる。MIDI変換パスでは読み込まれない。
+        from music21 import stream, note, duration, tempo, meter, key
+
         try:
-            # MMLテキストの前処理（空白、改行を除去）
-            mml_text = re.sub(r"\s+", "", mml_text.upper())
+            # MMLをイベント列に変換
+            events = self._mml_to_events(mml_text)
 
             # 新しいストリームを作成
             score = stream.Stream()
 
-            # デフォルト設定
-            current_octave = self.default_octave
-            current_length = self.default_length
-            current_tempo = self.default_tempo
-
             # テンポ設定
-            score.append(tempo.TempoIndication(number=current_tempo))
+            score.append(tempo.TempoIndication(number=self.default_tempo))
 
             # 拍子設定（4/4拍子）
             score.append(meter.TimeSignature("4/4"))
@@ -57,129 +486,18 @@ class MMLProcessor:
             # 調設定（C major）
             score.append(key.KeySignature(0))
 
-            # MMLコマンドの解析
-            i = 0
-            while i < len(mml_text):
-                char = mml_text[i]
-
-                if char in "CDEFGAB":
-                    # 音符の処理
-                    note_name = char
-                    i += 1
-
-                    # シャープ・フラットの処理
-                    if i < len(mml_text) and mml_text[i] in "#+":
-                        note_name += "#"
-                        i += 1
-                    elif i < len(mml_text) and mml_text[i] == "-":
-                        note_name += "b"
-                        i += 1
-
-                    # 音長の処理
-                    note_length = current_length
-                    if i < len(mml_text) and mml_text[i].isdigit():
-                        length_str = ""
-                        while i < len(mml_text) and mml_text[i].isdigit():
-                            length_str += mml_text[i]
-                            i += 1
-                        note_length = int(length_str)
-
-                    # ドットの処理（付点音符）
-                    dots = 0
-                    while i < len(mml_text) and mml_text[i] == ".":
-                        dots += 1
-                        i += 1
-
-                    # 音符を作成
-                    pitch_name = f"{note_name}{current_octave}"
-                    note_obj = note.Note(pitch_name)
-
-                    # 音長を設定
-                    quarter_length = 4.0 / note_length
-                    if dots > 0:
-                        # 付点音符の処理
-                        for _ in range(dots):
-                            quarter_length *= 1.5
-
-                    note_obj.duration = duration.Duration(quarterLength=quarter_length)
+            for event in events:
+                kind = event[0]
+                if kind == "note":
+                    note_obj = note.Note(event[1])
+                    note_obj.duration = duration.Duration(quarterLength=event[3] / _TICKS_PER_BEAT)
                     score.append(note_obj)
-
-                elif char == "R":
-                    # 休符の処理
-                    i += 1
-
-                    # 音長の処理
-                    rest_length = current_length
-                    if i < len(mml_text) and mml_text[i].isdigit():
-                        length_str = ""
-                        while i < len(mml_text) and mml_text[i].isdigit():
-                            length_str += mml_text[i]
-                            i += 1
-                        rest_length = int(length_str)
-
-                    # ドットの処理
-                    dots = 0
-                    while i < len(mml_text) and mml_text[i] == ".":
-                        dots += 1
-                        i += 1
-
-                    # 休符を作成
+                elif kind == "rest":
                     rest_obj = note.Rest()
-                    quarter_length = 4.0 / rest_length
-                    if dots > 0:
-                        for _ in range(dots):
-                            quarter_length *= 1.5
-
-                    rest_obj.duration = duration.Duration(quarterLength=quarter_length)
+                    rest_obj.duration = duration.Duration(quarterLength=event[1] / _TICKS_PER_BEAT)
                     score.append(rest_obj)
-
-                elif char == "O":
-                    # オクターブ設定
-                    i += 1
-                    if i < len(mml_text) and mml_text[i].isdigit():
-                        current_octave = int(mml_text[i])
-                        i += 1
-                    else:
-                        raise ValueError(f"オクターブ指定が不正です: 位置 {i}")
-
-                elif char == "L":
-                    # デフォルト音長設定
-                    i += 1
-                    if i < len(mml_text) and mml_text[i].isdigit():
-                        length_str = ""
-                        while i < len(mml_text) and mml_text[i].isdigit():
-                            length_str += mml_text[i]
-                            i += 1
-                        current_length = int(length_str)
-                    else:
-                        raise ValueError(f"音長指定が不正です: 位置 {i}")
-
-                elif char == "T":
-                    # テンポ設定
-                    i += 1
-                    if i < len(mml_text) and mml_text[i].isdigit():
-                        tempo_str = ""
-                        while i < len(mml_text) and mml_text[i].isdigit():
-                            tempo_str += mml_text[i]
-                            i += 1
-                        current_tempo = int(tempo_str)
-                        score.append(tempo.TempoIndication(number=current_tempo))
-                    else:
-                        raise ValueError(f"テンポ指定が不正です: 位置 {i}")
-
-                elif char == ">":
-                    # オクターブ上げ
-                    current_octave = min(current_octave + 1, 8)
-                    i += 1
-
-                elif char == "<":
-                    # オクターブ下げ
-                    current_octave = max(current_octave - 1, 0)
-                    i += 1
-
                 else:
-                    # 不明な文字
-                    raise ValueError(f"不明なMMLコマンド: '{char}' 位置 {i}")
+                    score.append(tempo.TempoIndication(number=event[1]))
 
             return score
 
@@ -199,52 +517,7 @@ class MMLProcessor:
             ValueError: MML構文エラーの場合
         """
         try:
-            # MMLを解析
-            score = self.parse_mml(mml_text)
-
-            # MIDIファイルに変換
-            midi_file = mido.MidiFile()
-            track = mido.MidiTrack()
-            midi_file.tracks.append(track)
-
-            # デフォルト設定
-            ticks_per_beat = midi_file.ticks_per_beat
-            current_time = 0
-
-            for element in score:
-                if isinstance(element, note.Note):
-                    # 音符の処理
-                    midi_note = element.pitch.midi
-                    velocity = 64  # デフォルトベロシティ
-
-                    # 音符の長さをティックに変換
-                    duration_ticks = int(element.duration.quarterLength * ticks_per_beat)
-
-                    # Note On
-                    track.append(mido.Message("note_on", channel=0, note=midi_note, velocity=velocity, time=current_time))
-
-                    # Note Off
-                    track.append(mido.Message("note_off", channel=0, note=midi_note, velocity=velocity, time=duration_ticks))
-
-                    current_time = 0  # 次のイベントまでの時間をリセット
-
-                elif isinstance(element, note.Rest):
-                    # 休符の処理
-                    duration_ticks = int(element.duration.quarterLength * ticks_per_beat)
-                    current_time += duration_ticks
-
-                elif isinstance(element, tempo.TempoIndication):
-                    # テンポ変更
-                    # music21のTempoIndicationオブジェクトからBPMを取得
-                    bpm = element.numberSounding if hasattr(element, "numberSounding") else getattr(element, "number", 120)
-                    microseconds_per_beat = int(60000000 / bpm)
-                    track.append(mido.MetaMessage("set_tempo", tempo=microseconds_per_beat, time=current_time))
-                    current_time = 0
-
-            # MIDIデータをバイト列として取得
-            midi_bytes = io.BytesIO()
-            midi_file.save(file=midi_bytes)
-            return midi_bytes.getvalue()
+            return _mml_to_midi_bytes(mml_text, self.default_octave, self.default_length, self.default_tempo)
 
         except Exception as e:
             raise ValueError(f"MIDI変換エラー: {str(e)}")
@@ -262,68 +535,29 @@ class MMLProcessor:
             ValueError: MML構文エラーの場合
         """
         try:
-            # MIDIファイルを作成
-            midi_file = mido.MidiFile()
-            ticks_per_beat = midi_file.ticks_per_beat
-
-            for track_index, mml_text in enumerate(track_mml_list):
-                # 各MMLを解析
-                score = self.parse_mml(mml_text)
-
-                # 新しいトラックを作成
-                track = mido.MidiTrack()
-                midi_file.tracks.append(track)
-
-                # トラック名を設定
-                track.append(mido.MetaMessage("track_name", name=f"Track {track_index + 1}", time=0))
-
-                # MIDIチャンネルを設定（最大16チャンネル）
-                channel = track_index % 16
-
-                current_time = 0
-
-                for element in score:
-                    if isinstance(element, note.Note):
-                        # 音符の処理
-                        midi_note = element.pitch.midi
-                        velocity = 64  # デフォルトベロシティ
-
-                        # 音符の長さをティックに変換
-                        duration_ticks = int(element.duration.quarterLength * ticks_per_beat)
-
-                        # Note On
-                        track.append(
-                            mido.Message("note_on", channel=channel, note=midi_note, velocity=velocity, time=current_time)
-                        )
-
-                        # Note Off
-                        track.append(
-                            mido.Message("note_off", channel=channel, note=midi_note, velocity=velocity, time=duration_ticks)
-                        )
-
-                        current_time = 0
-
-                    elif isinstance(element, note.Rest):
-                        # 休符の処理
-                        duration_ticks = int(element.duration.quarterLength * ticks_per_beat)
-                        current_time += duration_ticks
-
-                    elif isinstance(element, tempo.TempoIndication):
-                        # テンポ変更（最初のトラックのみ）
-                        if track_index == 0:
-                            bpm = (
-                                element.numberSounding
-                                if hasattr(element, "numberSounding")
-                                else getattr(element, "number", 120)
-                            )
-                            microseconds_per_beat = int(60000000 / bpm)
-                            track.append(mido.MetaMessage("set_tempo", tempo=microseconds_per_beat, time=current_time))
-                            current_time = 0
-
-            # MIDIデータをバイト列として取得
-            midi_bytes = io.BytesIO()
-            midi_file.save(file=midi_bytes)
-            return midi_bytes.getvalue()
+            # 各トラックは独立しているため、解析を並列化する
+            # （スレッドにすることでトークナイザのキャッシュも共有できる）
+            if len(track_mml_list) > 1:
+                track_events_list = list(_get_track_pool().map(self._mml_to_events, track_mml_list))
+            else:
+                track_events_list = [self._mml_to_events(mml_text) for mml_text in track_mml_list]
+
+            # SMFのヘッダーと全トラックを同じ再利用バッファに直接組み立てる
+            midi_data = _get_buf()
+            midi_data.extend(b"MThd" + struct.pack(">IHHH", 6, 1, len(track_events_list), _TICKS_PER_BEAT))
+
+            for track_index, events in enumerate(track_events_list):
+                # テンポメタイベントは最初のトラックのみ、チャンネルは最大16
+                _append_track(
+                    midi_data,
+                    events,
+                    channel=track_index % 16,
+                    initial_tempo=self.default_tempo,
+                    emit_tempo=track_index == 0,
+                    track_name=f"Track {track_index + 1}",
+                )
+
+            return bytes(midi_data)
 
         except Exception as e:
             raise ValueError(f"マルチトラックMIDI変換エラー: {str(e)}")
@@ -354,10 +588,11 @@ class MMLProcessor:
             Tuple[bool, str]: (検証結果, エラーメッセージ)
         """
         try:
-            # MMLを解析してみる
-            self.parse_mml(mml_text)
+            # トークナイザにかけてみる（music21は不要）
+            # 成功時は解析結果がキャッシュされ、続くMIDI変換がそのまま再利用する
+            self._mml_to_events(mml_text)
             return True, "MML構文は正常です"
         except ValueError as e:
-            return False, str(e)
+            return False, f"MML解析エラー: {str(e)}"
         except Exception as e:
             return False, f"予期しないエラー: {str(e)}"
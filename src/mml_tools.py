@@ -6,120 +6,321 @@ MML処理に関するMCPツールを提供します。
 """
 
 import os
-from typing import Dict, Any
-from .mml_processor import MMLProcessor
-from .midi_player import MIDIPlayer
+import re
+import atexit
+import functools
+import threading
+from typing import Dict, Any, Optional, Tuple
 
+# 重いモジュール（music21やrtmidiを連れてくる）は起動時ではなく
+# 初回使用時にインポートします。Noneはまだ未ロードであることを示します。
+MMLProcessor = None
+MIDIPlayer = None
+
+# ハンドラ呼び出しをまたいで再利用するインスタンスキャッシュ
+# （プロセッサ生成やMIDIデバイスのオープンは短いMMLに比べて高コスト）
+_processor_cache = None
+_player_cache: Dict[Optional[str], Any] = {}
+
+# トークナイザが受け付ける文字集合（検証の高速経路用）
+# ここで弾かれる入力は解析するまでもなく不正と分かる
+_MML_CHARSET = re.compile(r"^[A-Ga-gRrOoLlTt#+\-0-9.<>\s]*$")
+
+# MIDIデバイスへの同時アクセスを防ぐロック
+# （演奏自体はMIDIPlayer内のバックグラウンドスレッドで行われ、
+# ハンドラは演奏開始後すぐに応答を返します）
+_device_lock = threading.Lock()
+
+
+class ErrorCode:
+    """ツール実行結果に付与するエラーコード定数"""
+
+    MML_TEXT_REQUIRED = "MML_TEXT_REQUIRED"
+    OUTPUT_PATH_REQUIRED = "OUTPUT_PATH_REQUIRED"
+    MIDI_PATH_REQUIRED = "MIDI_PATH_REQUIRED"
+    TRACK_LIST_REQUIRED = "TRACK_LIST_REQUIRED"
+    TRACK_LIST_TYPE = "TRACK_LIST_TYPE"
+    INVALID_MML = "INVALID_MML"
+    FILE_NOT_FOUND = "FILE_NOT_FOUND"
+    INTERNAL = "INTERNAL"
 
-def register_mml_tools(server) -> None:
-    """MMLツールをMCPサーバーに登録します。
+
+class _ToolError(ValueError):
+    """エラーコード付きのツール実行エラー"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _error_result(prefix: str, e: Exception) -> Dict[str, Any]:
+    """例外からエラーコード付きの実行結果を組み立てます。
 
     Args:
-        server: MCPサーバーインスタンス
+        prefix (str): エラーメッセージの接頭辞
+        e (Exception): 発生した例外
+
+    Returns:
+        Dict[str, Any]: isErrorとcodeを含む実行結果
     """
+    code = getattr(e, "code", None)
+    if code is None:
+        if isinstance(e, FileNotFoundError):
+            code = ErrorCode.FILE_NOT_FOUND
+        elif isinstance(e, ValueError):
+            code = ErrorCode.INVALID_MML
+        else:
+            code = ErrorCode.INTERNAL
+    return {"content": [{"type": "text", "text": f"{prefix}: {str(e)}"}], "isError": True, "code": code}
 
-    # MML to MIDI変換ツール
-    server.register_tool(
-        name="mml_to_midi",
-        description="MMLテキストをMIDIファイルに変換して保存します",
-        input_schema={
-            "type": "object",
-            "properties": {
-                "mml_text": {"type": "string", "description": "変換するMMLテキスト（例: 'CDEFGAB'）"},
-                "output_path": {"type": "string", "description": "出力MIDIファイルのパス（例: 'output.mid'）"},
-            },
-            "required": ["mml_text", "output_path"],
-        },
-        handler=mml_to_midi,
-    )
-
-    # MIDI演奏ツール
-    server.register_tool(
-        name="play_midi",
-        description="MIDIファイルをMIDIデバイスで演奏します",
-        input_schema={
-            "type": "object",
-            "properties": {
-                "midi_path": {"type": "string", "description": "演奏するMIDIファイルのパス"},
-                "device_name": {"type": "string", "description": "使用するMIDIデバイス名（省略時はデフォルトデバイス）"},
-            },
-            "required": ["midi_path"],
-        },
-        handler=play_midi,
-    )
-
-    # MML演奏ツール
-    server.register_tool(
-        name="play_mml",
-        description="MMLテキストを直接演奏します（内部でMIDI変換）",
-        input_schema={
-            "type": "object",
-            "properties": {
-                "mml_text": {"type": "string", "description": "演奏するMMLテキスト（例: 'CDEFGAB'）"},
-                "device_name": {"type": "string", "description": "使用するMIDIデバイス名（省略時はデフォルトデバイス）"},
-            },
-            "required": ["mml_text"],
-        },
-        handler=play_mml,
-    )
-
-    # MMLバリデーションツール
-    server.register_tool(
-        name="validate_mml",
-        description="MML構文を検証します",
-        input_schema={
-            "type": "object",
-            "properties": {"mml_text": {"type": "string", "description": "検証するMMLテキスト"}},
-            "required": ["mml_text"],
-        },
-        handler=validate_mml,
-    )
-
-    # MIDIデバイス一覧ツール
-    server.register_tool(
-        name="list_midi_devices",
-        description="利用可能なMIDIデバイスの一覧を取得します",
-        input_schema={"type": "object", "properties": {}, "required": []},
-        handler=list_midi_devices,
-    )
-
-    # マルチトラックMML to MIDI変換ツール
-    server.register_tool(
-        name="mml_multitrack_to_midi",
-        description="複数のMMLテキストをマルチトラックMIDIファイルに変換して保存します",
-        input_schema={
-            "type": "object",
-            "properties": {
-                "track_mml_list": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "各トラックのMMLテキストのリスト（例: ['CDEFGAB', 'EGBEGB']）",
-                },
-                "output_path": {"type": "string", "description": "出力MIDIファイルのパス（例: 'multitrack.mid'）"},
-            },
-            "required": ["track_mml_list", "output_path"],
+
+def _load_processor_class():
+    """MMLProcessorクラスを遅延インポートして返します。
+
+    Returns:
+        type: MMLProcessorクラス
+    """
+    global MMLProcessor
+    if MMLProcessor is None:
+        from .mml_processor import MMLProcessor as processor_class
+
+        MMLProcessor = processor_class
+    return MMLProcessor
+
+
+def _load_player_class():
+    """MIDIPlayerクラスを遅延インポートして返します。
+
+    Returns:
+        type: MIDIPlayerクラス
+    """
+    global MIDIPlayer
+    if MIDIPlayer is None:
+        from .midi_player import MIDIPlayer as player_class
+
+        MIDIPlayer = player_class
+    return MIDIPlayer
+
+
+def _get_processor() -> "MMLProcessor":
+    """共有のMMLProcessorインスタンスを返します。
+
+    初回呼び出し時にのみ生成し、以降は再利用します。クラスが
+    差し替えられた場合（テストのモックなど）は作り直します。
+
+    Returns:
+        MMLProcessor: 共有のプロセッサインスタンス
+    """
+    global _processor_cache
+    processor_class = _load_processor_class()
+    if _processor_cache is None or _processor_cache.__class__ is not processor_class:
+        _processor_cache = processor_class()
+    return _processor_cache
+
+
+def _get_player(device_name: Optional[str] = None) -> "MIDIPlayer":
+    """デバイス名ごとに共有のMIDIPlayerインスタンスを返します。
+
+    MIDIデバイスのオープンは呼び出しごとに行わず、デバイス名を
+    キーにキャッシュします。クラスが差し替えられた場合は作り直します。
+
+    Args:
+        device_name (Optional[str]): 使用するMIDIデバイス名
+
+    Returns:
+        MIDIPlayer: 共有のプレイヤーインスタンス
+    """
+    player_class = _load_player_class()
+    player = _player_cache.get(device_name)
+    if player is None or player.__class__ is not player_class:
+        player = player_class(device_name=device_name)
+        _player_cache[device_name] = player
+    return player
+
+
+@functools.lru_cache(maxsize=256)
+def _mml_to_midi_cached(processor: "MMLProcessor", mml_text: str) -> bytes:
+    """MML→MIDI変換の結果をMMLテキストをキーにキャッシュします。
+
+    プロセッサインスタンスもキーに含めるため、インスタンスが
+    差し替えられた場合に古い結果を返すことはありません。
+
+    Args:
+        processor (MMLProcessor): 変換に使用するプロセッサ
+        mml_text (str): MMLテキスト
+
+    Returns:
+        bytes: MIDIデータ
+    """
+    return processor.mml_to_midi_data(mml_text)
+
+
+@functools.lru_cache(maxsize=256)
+def _multitrack_to_midi_cached(processor: "MMLProcessor", track_mml_tuple: tuple) -> bytes:
+    """マルチトラックMML→MIDI変換の結果をトラックのタプルをキーにキャッシュします。
+
+    Args:
+        processor (MMLProcessor): 変換に使用するプロセッサ
+        track_mml_tuple (tuple): 各トラックのMMLテキストのタプル
+
+    Returns:
+        bytes: マルチトラックMIDIデータ
+    """
+    return processor.mml_multitrack_to_midi_data(list(track_mml_tuple))
+
+
+@functools.lru_cache(maxsize=256)
+def _validate_mml_cached(processor: "MMLProcessor", mml_text: str) -> Tuple[bool, str]:
+    """MML構文検証の結果をMMLテキストをキーにキャッシュします。
+
+    Args:
+        processor (MMLProcessor): 検証に使用するプロセッサ
+        mml_text (str): MMLテキスト
+
+    Returns:
+        Tuple[bool, str]: (検証結果, メッセージ)
+    """
+    return processor.validate_mml_syntax(mml_text)
+
+
+def _trunc(s: str, n: int) -> str:
+    """文字列をn文字に切り詰め、超過時は末尾に'...'を付けます。
+
+    Args:
+        s (str): 対象文字列
+        n (int): 最大文字数
+
+    Returns:
+        str: 切り詰め後の文字列
+    """
+    return s if len(s) <= n else s[:n] + "..."
+
+
+def _mml_to_midi_stream(mml_text: str, buf) -> int:
+    """MMLをMIDIデータに変換してファイルライクオブジェクトへ書き込みます。
+
+    ディスクを経由せずに変換結果を受け取りたい場合に使用します。
+
+    Args:
+        mml_text (str): MMLテキスト
+        buf: write(bytes)を持つ書き込み先オブジェクト
+
+    Returns:
+        int: 書き込んだバイト数
+
+    Raises:
+        ValueError: MML構文エラーの場合
+    """
+    midi_data = _mml_to_midi_cached(_get_processor(), mml_text)
+    buf.write(midi_data)
+    return len(midi_data)
+
+
+def _write_midi(midi_data: bytes, path: str) -> int:
+    """MIDIデータを1回のシステムコールでファイルに書き込みます。
+
+    Args:
+        midi_data (bytes): MIDIデータ
+        path (str): 書き込み先ファイルパス
+
+    Returns:
+        int: 書き込んだバイト数
+
+    Raises:
+        IOError: ファイル保存エラーの場合
+    """
+    from pathlib import Path
+
+    try:
+        Path(path).write_bytes(midi_data)
+    except Exception as e:
+        raise IOError(f"MIDIファイル保存エラー: {str(e)}")
+    return len(midi_data)
+
+
+def _shutdown_players() -> None:
+    """キャッシュ済みプレイヤーを停止してクリアします。"""
+    for player in _player_cache.values():
+        try:
+            player.stop()
+        except Exception:
+            pass
+    _player_cache.clear()
+
+
+atexit.register(_shutdown_players)
+
+
+# 各ツールの入力スキーマ（インポート時に一度だけ構築し、登録時は参照を渡す）
+_MML_TO_MIDI_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "mml_text": {"type": "string", "description": "変換するMMLテキスト（例: 'CDEFGAB'）"},
+        "output_path": {"type": "string", "description": "出力MIDIファイルのパス（例: 'output.mid'）"},
+    },
+    "required": ["mml_text", "output_path"],
+}
+
+_PLAY_MIDI_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "midi_path": {"type": "string", "description": "演奏するMIDIファイルのパス"},
+        "device_name": {"type": "string", "description": "使用するMIDIデバイス名（省略時はデフォルトデバイス）"},
+    },
+    "required": ["midi_path"],
+}
+
+_PLAY_MML_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "mml_text": {"type": "string", "description": "演奏するMMLテキスト（例: 'CDEFGAB'）"},
+        "device_name": {"type": "string", "description": "使用するMIDIデバイス名（省略時はデフォルトデバイス）"},
+    },
+    "required": ["mml_text"],
+}
+
+_VALIDATE_MML_SCHEMA = {
+    "type": "object",
+    "properties": {"mml_text": {"type": "string", "description": "検証するMMLテキスト"}},
+    "required": ["mml_text"],
+}
+
+_LIST_MIDI_DEVICES_SCHEMA = {"type": "object", "properties": {}, "required": []}
+
+_MML_MULTITRACK_TO_MIDI_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "track_mml_list": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "各トラックのMMLテキストのリスト（例: ['CDEFGAB', 'EGBEGB']）",
         },
-        handler=mml_multitrack_to_midi,
-    )
-
-    # マルチトラックMML演奏ツール
-    server.register_tool(
-        name="play_mml_multitrack",
-        description="複数のMMLテキストをマルチトラックで直接演奏します",
-        input_schema={
-            "type": "object",
-            "properties": {
-                "track_mml_list": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "各トラックのMMLテキストのリスト（例: ['CDEFGAB', 'EGBEGB']）",
-                },
-                "device_name": {"type": "string", "description": "使用するMIDIデバイス名（省略時はデフォルトデバイス）"},
-            },
-            "required": ["track_mml_list"],
+        "output_path": {"type": "string", "description": "出力MIDIファイルのパス（例: 'multitrack.mid'）"},
+    },
+    "required": ["track_mml_list", "output_path"],
+}
+
+_PLAY_MML_MULTITRACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "track_mml_list": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "各トラックのMMLテキストのリスト（例: ['CDEFGAB', 'EGBEGB']）",
         },
-        handler=play_mml_multitrack,
-    )
+        "device_name": {"type": "string", "description": "使用するMIDIデバイス名（省略時はデフォルトデバイス）"},
+    },
+    "required": ["track_mml_list"],
+}
+
+
+def register_mml_tools(server) -> None:
+    """MMLツールをMCPサーバーに登録します。
+
+    Args:
+        server: MCPサーバーインスタンス
+    """
+    server.register_tools_bulk(_TOOL_SPECS)
 
 
 def mml_to_midi(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -134,32 +335,25 @@ def mml_to_midi(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 実行結果
     """
     try:
-        mml_text = params.get("mml_text")
-        output_path = params.get("output_path")
+        get = params.get
+        mml_text = get("mml_text")
+        output_path = get("output_path")
 
         if not mml_text:
-            raise ValueError("mml_textパラメータが必要です")
+            raise _ToolError(ErrorCode.MML_TEXT_REQUIRED, "mml_textパラメータが必要です")
         if not output_path:
-            raise ValueError("output_pathパラメータが必要です")
-
-        # MMLプロセッサを作成
-        processor = MMLProcessor()
-
-        # MMLをMIDIデータに変換
-        midi_data = processor.mml_to_midi_data(mml_text)
-
-        # ファイルに保存
-        processor.save_midi_file(midi_data, output_path)
+            raise _ToolError(ErrorCode.OUTPUT_PATH_REQUIRED, "output_pathパラメータが必要です")
 
-        # ファイルサイズを取得
-        file_size = os.path.getsize(output_path)
+        # 先に変換を済ませてから書き込む（変換失敗時にファイルを残さないため）
+        midi_data = _mml_to_midi_cached(_get_processor(), mml_text)
+        file_size = _write_midi(midi_data, output_path)
 
         return {
             "content": [
                 {
                     "type": "text",
                     "text": f"MMLをMIDIファイルに変換しました。\n"
-                    f"入力MML: {mml_text[:100]}{'...' if len(mml_text) > 100 else ''}\n"
+                    f"入力MML: {_trunc(mml_text, 100)}\n"
                     f"出力ファイル: {output_path}\n"
                     f"ファイルサイズ: {file_size} bytes",
                 }
@@ -167,7 +361,7 @@ def mml_to_midi(params: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"MML to MIDI変換エラー: {str(e)}"}], "isError": True}
+        return _error_result("MML to MIDI変換エラー", e)
 
 
 def play_midi(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -182,17 +376,23 @@ def play_midi(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 実行結果
     """
     try:
-        midi_path = params.get("midi_path")
-        device_name = params.get("device_name")
+        get = params.get
+        midi_path = get("midi_path")
+        device_name = get("device_name")
 
         if not midi_path:
-            raise ValueError("midi_pathパラメータが必要です")
+            raise _ToolError(ErrorCode.MIDI_PATH_REQUIRED, "midi_pathパラメータが必要です")
 
-        # MIDIプレイヤーを作成
-        player = MIDIPlayer(device_name=device_name)
+        # デバイスを開く前にファイルの存在を確認（早期エラー）
+        if not os.path.exists(midi_path):
+            raise FileNotFoundError(f"MIDIファイルが見つかりません: {midi_path}")
 
-        # MIDIファイルを演奏
-        player.play_midi_file(midi_path)
+        # 共有のMIDIプレイヤーを取得
+        player = _get_player(device_name)
+
+        # MIDIファイルを演奏（演奏はバックグラウンドスレッドで継続）
+        with _device_lock:
+            player.play_midi_file(midi_path)
 
         # デバイス情報を取得
         device_info = player.get_device_info()
@@ -210,7 +410,7 @@ def play_midi(params: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"MIDI演奏エラー: {str(e)}"}], "isError": True}
+        return _error_result("MIDI演奏エラー", e)
 
 
 def play_mml(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -225,23 +425,25 @@ def play_mml(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 実行結果
     """
     try:
-        mml_text = params.get("mml_text")
-        device_name = params.get("device_name")
+        get = params.get
+        mml_text = get("mml_text")
+        device_name = get("device_name")
 
         if not mml_text:
-            raise ValueError("mml_textパラメータが必要です")
+            raise _ToolError(ErrorCode.MML_TEXT_REQUIRED, "mml_textパラメータが必要です")
 
-        # MMLプロセッサを作成
-        processor = MMLProcessor()
+        # 共有のMMLプロセッサを取得
+        processor = _get_processor()
 
-        # MMLをMIDIデータに変換
-        midi_data = processor.mml_to_midi_data(mml_text)
+        # MMLをMIDIデータに変換（同一テキストはキャッシュから返す）
+        midi_data = _mml_to_midi_cached(processor, mml_text)
 
-        # MIDIプレイヤーを作成
-        player = MIDIPlayer(device_name=device_name)
+        # 共有のMIDIプレイヤーを取得
+        player = _get_player(device_name)
 
-        # MIDIデータを演奏
-        player.play_midi_data(midi_data)
+        # MIDIデータを演奏（演奏はバックグラウンドスレッドで継続）
+        with _device_lock:
+            player.play_midi_data(midi_data)
 
         # デバイス情報を取得
         device_info = player.get_device_info()
@@ -251,7 +453,7 @@ def play_mml(params: Dict[str, Any]) -> Dict[str, Any]:
                 {
                     "type": "text",
                     "text": f"MMLの演奏を開始しました。\n"
-                    f"MML: {mml_text[:100]}{'...' if len(mml_text) > 100 else ''}\n"
+                    f"MML: {_trunc(mml_text, 100)}\n"
                     f"使用デバイス: {device_info['current_device']}\n"
                     f"演奏状態: {'演奏中' if device_info['is_playing'] else '停止中'}",
                 }
@@ -259,7 +461,7 @@ def play_mml(params: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"MML演奏エラー: {str(e)}"}], "isError": True}
+        return _error_result("MML演奏エラー", e)
 
 
 def validate_mml(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -276,29 +478,39 @@ def validate_mml(params: Dict[str, Any]) -> Dict[str, Any]:
         mml_text = params.get("mml_text")
 
         if not mml_text:
-            raise ValueError("mml_textパラメータが必要です")
-
-        # MMLプロセッサを作成
-        processor = MMLProcessor()
+            raise _ToolError(ErrorCode.MML_TEXT_REQUIRED, "mml_textパラメータが必要です")
+
+        # 不正な文字を含む入力は解析せずに弾く（高速経路）
+        if not _MML_CHARSET.match(mml_text):
+            # 実パーサと同じ正規化（空白除去・大文字化）後の位置で報告する
+            normalized = re.sub(r"\s+", "", mml_text.upper())
+            bad_index, bad_char = next((i, c) for i, c in enumerate(normalized) if not _MML_CHARSET.match(c))
+            is_valid, message = False, f"MML解析エラー: 不明なMMLコマンド: '{bad_char}' 位置 {bad_index}"
+        else:
+            # 共有のMMLプロセッサを取得
+            processor = _get_processor()
 
-        # MML構文を検証
-        is_valid, message = processor.validate_mml_syntax(mml_text)
+            # MML構文を検証（同一テキストはキャッシュから返す）
+            is_valid, message = _validate_mml_cached(processor, mml_text)
 
-        return {
+        result = {
             "content": [
                 {
                     "type": "text",
                     "text": f"MML構文検証結果:\n"
-                    f"MML: {mml_text[:100]}{'...' if len(mml_text) > 100 else ''}\n"
+                    f"MML: {_trunc(mml_text, 100)}\n"
                     f"結果: {'✓ 正常' if is_valid else '✗ エラー'}\n"
                     f"詳細: {message}",
                 }
             ],
             "isError": not is_valid,
         }
+        if not is_valid:
+            result["code"] = ErrorCode.INVALID_MML
+        return result
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"MML検証エラー: {str(e)}"}], "isError": True}
+        return _error_result("MML検証エラー", e)
 
 
 def list_midi_devices(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -311,11 +523,8 @@ def list_midi_devices(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 実行結果
     """
     try:
-        # MIDIプレイヤーを作成
-        player = MIDIPlayer()
-
-        # 利用可能なデバイス一覧を取得
-        devices = player.get_available_devices()
+        # デバイスをオープンせずに一覧だけを列挙する
+        devices = _load_player_class().list_devices_static()
 
         if not devices:
             device_list = "利用可能なMIDIデバイスがありません。\n仮想MIDIポートが作成されます。"
@@ -325,7 +534,7 @@ def list_midi_devices(params: Dict[str, Any]) -> Dict[str, Any]:
         return {"content": [{"type": "text", "text": f"MIDIデバイス一覧:\n\n{device_list}"}]}
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"MIDIデバイス一覧取得エラー: {str(e)}"}], "isError": True}
+        return _error_result("MIDIデバイス一覧取得エラー", e)
 
 
 def mml_multitrack_to_midi(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -340,32 +549,28 @@ def mml_multitrack_to_midi(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 実行結果
     """
     try:
-        track_mml_list = params.get("track_mml_list")
-        output_path = params.get("output_path")
+        get = params.get
+        track_mml_list = get("track_mml_list")
+        output_path = get("output_path")
 
         if not track_mml_list:
-            raise ValueError("track_mml_listパラメータが必要です")
+            raise _ToolError(ErrorCode.TRACK_LIST_REQUIRED, "track_mml_listパラメータが必要です")
         if not output_path:
-            raise ValueError("output_pathパラメータが必要です")
+            raise _ToolError(ErrorCode.OUTPUT_PATH_REQUIRED, "output_pathパラメータが必要です")
         if not isinstance(track_mml_list, list):
-            raise ValueError("track_mml_listはリストである必要があります")
-
-        # MMLプロセッサを作成
-        processor = MMLProcessor()
+            raise _ToolError(ErrorCode.TRACK_LIST_TYPE, "track_mml_listはリストである必要があります")
 
-        # マルチトラックMMLをMIDIデータに変換
-        midi_data = processor.mml_multitrack_to_midi_data(track_mml_list)
+        # 共有のMMLプロセッサを取得
+        processor = _get_processor()
 
-        # ファイルに保存
-        processor.save_midi_file(midi_data, output_path)
+        # マルチトラックMMLをMIDIデータに変換（同一トラック構成はキャッシュから返す）
+        midi_data = _multitrack_to_midi_cached(processor, tuple(track_mml_list))
 
-        # ファイルサイズを取得
-        file_size = os.path.getsize(output_path)
+        # ファイルに保存（書き込んだバイト数がそのままファイルサイズ）
+        file_size = _write_midi(midi_data, output_path)
 
         # トラック情報を作成
-        track_info = "\n".join(
-            [f"トラック{i + 1}: {mml[:50]}{'...' if len(mml) > 50 else ''}" for i, mml in enumerate(track_mml_list)]
-        )
+        track_info = "\n".join(f"トラック{i + 1}: {_trunc(mml, 50)}" for i, mml in enumerate(track_mml_list))
 
         return {
             "content": [
@@ -381,7 +586,7 @@ def mml_multitrack_to_midi(params: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"マルチトラックMML to MIDI変換エラー: {str(e)}"}], "isError": True}
+        return _error_result("マルチトラックMML to MIDI変換エラー", e)
 
 
 def play_mml_multitrack(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -396,33 +601,33 @@ def play_mml_multitrack(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 実行結果
     """
     try:
-        track_mml_list = params.get("track_mml_list")
-        device_name = params.get("device_name")
+        get = params.get
+        track_mml_list = get("track_mml_list")
+        device_name = get("device_name")
 
         if not track_mml_list:
-            raise ValueError("track_mml_listパラメータが必要です")
+            raise _ToolError(ErrorCode.TRACK_LIST_REQUIRED, "track_mml_listパラメータが必要です")
         if not isinstance(track_mml_list, list):
-            raise ValueError("track_mml_listはリストである必要があります")
+            raise _ToolError(ErrorCode.TRACK_LIST_TYPE, "track_mml_listはリストである必要があります")
 
-        # MMLプロセッサを作成
-        processor = MMLProcessor()
+        # 共有のMMLプロセッサを取得
+        processor = _get_processor()
 
-        # マルチトラックMMLをMIDIデータに変換
-        midi_data = processor.mml_multitrack_to_midi_data(track_mml_list)
+        # マルチトラックMMLをMIDIデータに変換（同一トラック構成はキャッシュから返す）
+        midi_data = _multitrack_to_midi_cached(processor, tuple(track_mml_list))
 
-        # MIDIプレイヤーを作成
-        player = MIDIPlayer(device_name=device_name)
+        # 共有のMIDIプレイヤーを取得
+        player = _get_player(device_name)
 
-        # MIDIデータを演奏
-        player.play_midi_data(midi_data)
+        # MIDIデータを演奏（演奏はバックグラウンドスレッドで継続）
+        with _device_lock:
+            player.play_midi_data(midi_data)
 
         # デバイス情報を取得
         device_info = player.get_device_info()
 
         # トラック情報を作成
-        track_info = "\n".join(
-            [f"トラック{i + 1}: {mml[:50]}{'...' if len(mml) > 50 else ''}" for i, mml in enumerate(track_mml_list)]
-        )
+        track_info = "\n".join(f"トラック{i + 1}: {_trunc(mml, 50)}" for i, mml in enumerate(track_mml_list))
 
         return {
             "content": [
@@ -438,4 +643,51 @@ def play_mml_multitrack(params: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        return {"content": [{"type": "text", "text": f"マルチトラックMML演奏エラー: {str(e)}"}], "isError": True}
+        return _error_result("マルチトラックMML演奏エラー", e)
+
+
+# 全ツールの定義（インポート時に一度だけ構築し、一括登録に使用）
+_TOOL_SPECS = [
+    {
+        "name": "mml_to_midi",
+        "description": "MMLテキストをMIDIファイルに変換して保存します",
+        "inputSchema": _MML_TO_MIDI_SCHEMA,
+        "handler": mml_to_midi,
+    },
+    {
+        "name": "play_midi",
+        "description": "MIDIファイルをMIDIデバイスで演奏します",
+        "inputSchema": _PLAY_MIDI_SCHEMA,
+        "handler": play_midi,
+    },
+    {
+        "name": "play_mml",
+        "description": "MMLテキストを直接演奏します（内部でMIDI変換）",
+        "inputSchema": _PLAY_MML_SCHEMA,
+        "handler": play_mml,
+    },
+    {
+        "name": "validate_mml",
+        "description": "MML構文を検証します",
+        "inputSchema": _VALIDATE_MML_SCHEMA,
+        "handler": validate_mml,
+    },
+    {
+        "name": "list_midi_devices",
+        "description": "利用可能なMIDIデバイスの一覧を取得します",
+        "inputSchema": _LIST_MIDI_DEVICES_SCHEMA,
+        "handler": list_midi_devices,
+    },
+    {
+        "name": "mml_multitrack_to_midi",
+        "description": "複数のMMLテキストをマルチトラックMIDIファイルに変換して保存します",
+        "inputSchema": _MML_MULTITRACK_TO_MIDI_SCHEMA,
+        "handler": mml_multitrack_to_midi,
+    },
+    {
+        "name": "play_mml_multitrack",
+        "description": "複数のMMLテキストをマルチトラックで直接演奏します",
+        "inputSchema": _PLAY_MML_MULTITRACK_SCHEMA,
+        "handler": play_mml_multitrack,
+    },
+]
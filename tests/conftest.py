@@ -1,4 +1,18 @@
 import sys
 import os
 
+import pytest
+
 sys.path.insert(0, os.getcwd())
+
+
+@pytest.fixture(scope="session")
+def canonical_midi_bytes():
+    """正規の音階MML（CDEFGAB）を一度だけMIDI変換したバイト列
+
+    有効なMIDIファイルが必要なだけのテストは、変換パイプラインを
+    再実行せずにこのバイト列を書き出して使います。
+    """
+    from src.mml_processor import MMLProcessor
+
+    return MMLProcessor().mml_to_midi_data("CDEFGAB")
@@ -5,7 +5,7 @@ MCPサーバーのテスト
 import json
 from unittest.mock import patch
 
-from src.mcp_server import MCPServer
+from src.mcp_server import MCPServer, _HAS_ORJSON
 
 
 def test_mcp_server_initialization():
@@ -56,8 +56,15 @@ def test_send_response(mock_stdout):
 
     # 標準出力に正しいJSONが出力されていることを確認
     # 注: 実装によっては、writeが2回呼ばれる場合があります（JSONと改行を別々に書き込む場合）
-    mock_stdout.write.assert_any_call(json.dumps(response))
-    mock_stdout.flush.assert_called_once()
+    if _HAS_ORJSON:
+        # orjsonがある場合はbytesをバッファに直接書き込む
+        import orjson
+
+        mock_stdout.buffer.write.assert_any_call(orjson.dumps(response) + b"\n")
+        mock_stdout.buffer.flush.assert_called_once()
+    else:
+        mock_stdout.write.assert_any_call(json.dumps(response))
+        mock_stdout.flush.assert_called_once()
 
 
 @patch("src.mcp_server.MCPServer._send_result")
@@ -3,49 +3,62 @@
 MMLプロセッサのテストコード
 """
 
+import io
 import pytest
 import tempfile
 import os
+import mido
+from pathlib import Path
+from music21 import note
 from src.mml_processor import MMLProcessor
 
 
+@pytest.fixture(scope="module")
+def processor():
+    """モジュール内で共有するMMLプロセッサ"""
+    return MMLProcessor()
+
+
+@pytest.fixture(scope="module")
+def scale_stream(processor):
+    """音階MML（CDEFGAB）を一度だけ解析したストリーム"""
+    return processor.parse_mml("CDEFGAB")
+
+
+@pytest.fixture(scope="module")
+def scale_midi_data(processor):
+    """音階MML（CDEFGAB）を一度だけMIDI変換したデータ"""
+    return processor.mml_to_midi_data("CDEFGAB")
+
+
 class TestMMLProcessor:
     """MMLプロセッサのテストクラス"""
 
-    def setup_method(self):
-        """テストメソッドの前処理"""
-        self.processor = MMLProcessor()
-
-    def test_simple_mml_parsing(self):
+    def test_simple_mml_parsing(self, scale_stream):
         """シンプルなMML解析のテスト"""
-        mml = "CDEFGAB"
-        stream = self.processor.parse_mml(mml)
-
         # ストリームが作成されることを確認
-        assert stream is not None
+        assert scale_stream is not None
 
         # 音符の数を確認（メタデータを除く）
-        notes = [element for element in stream if hasattr(element, "pitch")]
-        assert len(notes) == 7
+        assert sum(1 for element in scale_stream if isinstance(element, note.Note)) == 7
 
-    def test_mml_with_octave(self):
+    def test_mml_with_octave(self, processor):
         """オクターブ指定付きMMLのテスト"""
         mml = "O4CDEFGAB"
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
-        notes = [element for element in stream if hasattr(element, "pitch")]
-        assert len(notes) == 7
+        assert sum(1 for element in stream if isinstance(element, note.Note)) == 7
 
         # 最初の音符のオクターブを確認
-        first_note = notes[0]
+        first_note = next(element for element in stream if isinstance(element, note.Note))
         assert first_note.pitch.octave == 4
 
-    def test_mml_with_length(self):
+    def test_mml_with_length(self, processor):
         """音長指定付きMMLのテスト"""
         mml = "C4D8E2"
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
-        notes = [element for element in stream if hasattr(element, "pitch")]
+        notes = [element for element in stream if isinstance(element, note.Note)]
         assert len(notes) == 3
 
         # 音長を確認
@@ -53,24 +66,21 @@ class TestMMLProcessor:
         assert notes[1].duration.quarterLength == 0.5  # 8分音符
         assert notes[2].duration.quarterLength == 2.0  # 2分音符
 
-    def test_mml_with_rest(self):
+    def test_mml_with_rest(self, processor):
         """休符付きMMLのテスト"""
         mml = "CR4DR8E"
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
         # 音符と休符の数を確認
-        notes = [element for element in stream if hasattr(element, "pitch")]
-        rests = [element for element in stream if hasattr(element, "isRest") and element.isRest]
-
-        assert len(notes) == 3
-        assert len(rests) == 2
+        assert sum(1 for element in stream if isinstance(element, note.Note)) == 3
+        assert sum(1 for element in stream if isinstance(element, note.Rest)) == 2
 
-    def test_mml_with_sharp_flat(self):
+    def test_mml_with_sharp_flat(self, processor):
         """シャープ・フラット付きMMLのテスト"""
         mml = "C#D-E"
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
-        notes = [element for element in stream if hasattr(element, "pitch")]
+        notes = [element for element in stream if isinstance(element, note.Note)]
         assert len(notes) == 3
 
         # シャープ・フラットを確認
@@ -78,34 +88,30 @@ class TestMMLProcessor:
         assert notes[1].pitch.name == "D-"
         assert notes[2].pitch.name == "E"
 
-    def test_mml_with_tempo(self):
+    def test_mml_with_tempo(self, processor):
         """テンポ指定付きMMLのテスト"""
         mml = "T120CDEFG"
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
         # テンポ指定が含まれることを確認
         from music21 import tempo
 
-        tempo_indications = [element for element in stream if isinstance(element, tempo.TempoIndication)]
-        assert len(tempo_indications) > 0
+        assert any(isinstance(element, tempo.TempoIndication) for element in stream)
 
-    def test_mml_with_default_length(self):
+    def test_mml_with_default_length(self, processor):
         """デフォルト音長指定付きMMLのテスト"""
         mml = "L8CDEFG"
-        stream = self.processor.parse_mml(mml)
-
-        notes = [element for element in stream if hasattr(element, "pitch")]
+        stream = processor.parse_mml(mml)
 
         # 全ての音符が8分音符になることを確認
-        for note in notes:
-            assert note.duration.quarterLength == 0.5
+        assert all(element.duration.quarterLength == 0.5 for element in stream if isinstance(element, note.Note))
 
-    def test_mml_with_octave_change(self):
+    def test_mml_with_octave_change(self, processor):
         """オクターブ変更記号付きMMLのテスト"""
         mml = "C>C<C"
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
-        notes = [element for element in stream if hasattr(element, "pitch")]
+        notes = [element for element in stream if isinstance(element, note.Note)]
         assert len(notes) == 3
 
         # オクターブの変化を確認
@@ -113,111 +119,112 @@ class TestMMLProcessor:
         assert notes[1].pitch.octave == 5  # >で上がる
         assert notes[2].pitch.octave == 4  # <で下がる
 
-    def test_mml_with_dots(self):
+    def test_mml_with_dots(self, processor):
         """付点音符付きMMLのテスト"""
         mml = "C4.D8."
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
-        notes = [element for element in stream if hasattr(element, "pitch")]
+        notes = [element for element in stream if isinstance(element, note.Note)]
         assert len(notes) == 2
 
         # 付点音符の音長を確認
         assert notes[0].duration.quarterLength == 1.5  # 4分音符の付点
         assert notes[1].duration.quarterLength == 0.75  # 8分音符の付点
 
-    def test_mml_to_midi_data(self):
+    def test_mml_to_midi_data(self, scale_midi_data):
         """MMLからMIDIデータ変換のテスト"""
-        mml = "CDEFGAB"
-        midi_data = self.processor.mml_to_midi_data(mml)
-
         # MIDIデータが生成されることを確認
-        assert isinstance(midi_data, bytes)
-        assert len(midi_data) > 0
+        assert isinstance(scale_midi_data, bytes)
+        assert len(scale_midi_data) > 0
 
         # MIDIファイルヘッダーを確認
-        assert midi_data[:4] == b"MThd"
+        assert scale_midi_data[:4] == b"MThd"
 
-    def test_save_midi_file(self):
-        """MIDIファイル保存のテスト"""
-        mml = "CDEFGAB"
-        midi_data = self.processor.mml_to_midi_data(mml)
+    def test_high_octave_note_clamped(self, processor):
+        """MIDI範囲を超える高音域の音符がオクターブ下げで収まるテスト"""
+        # O9Bは素の計算では131になるが、SMFのデータバイトは0-127が上限
+        midi_data = processor.mml_to_midi_data("O9B")
 
+        # midoが読める（データバイトが範囲内の）SMFであることを確認
+        midi_file = mido.MidiFile(file=io.BytesIO(midi_data))
+        note_on = next(msg for track in midi_file.tracks for msg in track if msg.type == "note_on")
+        assert note_on.note == 119
+
+    def test_save_midi_file(self, processor, scale_midi_data):
+        """MIDIファイル保存のテスト"""
         with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp_file:
             tmp_path = tmp_file.name
 
         try:
             # ファイルに保存
-            self.processor.save_midi_file(midi_data, tmp_path)
+            processor.save_midi_file(scale_midi_data, tmp_path)
 
-            # ファイルが作成されることを確認
-            assert os.path.exists(tmp_path)
-            assert os.path.getsize(tmp_path) > 0
+            # ファイルが作成されることを確認（statは1回で済ませる）
+            assert os.stat(tmp_path).st_size > 0
 
             # ファイル内容を確認
             with open(tmp_path, "rb") as f:
                 saved_data = f.read()
-            assert saved_data == midi_data
+            assert saved_data == scale_midi_data
 
         finally:
-            # テンポラリファイルを削除
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            # テンポラリファイルを削除（存在確認を挟まず1回の呼び出しで行う）
+            Path(tmp_path).unlink(missing_ok=True)
 
-    def test_validate_mml_syntax_valid(self):
+    def test_validate_mml_syntax_valid(self, processor):
         """正常なMML構文の検証テスト"""
         valid_mml = "O4L4CDEFGAB"
-        is_valid, message = self.processor.validate_mml_syntax(valid_mml)
+        is_valid, message = processor.validate_mml_syntax(valid_mml)
 
         assert is_valid is True
         assert "正常" in message
 
-    def test_validate_mml_syntax_invalid(self):
+    def test_validate_mml_syntax_invalid(self, processor):
         """不正なMML構文の検証テスト"""
         invalid_mml = "CDEFGABX"  # Xは不正な文字
-        is_valid, message = self.processor.validate_mml_syntax(invalid_mml)
+        is_valid, message = processor.validate_mml_syntax(invalid_mml)
 
         assert is_valid is False
         assert "エラー" in message or "不明" in message
 
-    def test_empty_mml(self):
+    def test_empty_mml(self, processor):
         """空のMMLのテスト"""
         mml = ""
-        stream = self.processor.parse_mml(mml)
+        stream = processor.parse_mml(mml)
 
         # 空のストリームでもメタデータは含まれる
         assert stream is not None
 
         # 音符は含まれない
-        notes = [element for element in stream if hasattr(element, "pitch")]
-        assert len(notes) == 0
+        assert sum(1 for element in stream if isinstance(element, note.Note)) == 0
 
-    def test_whitespace_handling(self):
+    def test_whitespace_handling(self, processor):
         """空白文字の処理テスト"""
         mml_with_spaces = "C D E F G"
         mml_without_spaces = "CDEFG"
 
-        stream1 = self.processor.parse_mml(mml_with_spaces)
-        stream2 = self.processor.parse_mml(mml_without_spaces)
+        stream1 = processor.parse_mml(mml_with_spaces)
+        stream2 = processor.parse_mml(mml_without_spaces)
 
         # 空白があってもなくても同じ結果になることを確認
-        notes1 = [element for element in stream1 if hasattr(element, "pitch")]
-        notes2 = [element for element in stream2 if hasattr(element, "pitch")]
+        count1 = sum(1 for element in stream1 if isinstance(element, note.Note))
+        count2 = sum(1 for element in stream2 if isinstance(element, note.Note))
 
-        assert len(notes1) == len(notes2)
+        assert count1 == count2
 
-    def test_case_insensitive(self):
+    def test_case_insensitive(self, processor):
         """大文字小文字の処理テスト"""
         mml_upper = "CDEFG"
         mml_lower = "cdefg"
 
-        stream1 = self.processor.parse_mml(mml_upper)
-        stream2 = self.processor.parse_mml(mml_lower)
+        stream1 = processor.parse_mml(mml_upper)
+        stream2 = processor.parse_mml(mml_lower)
 
         # 大文字小文字に関係なく同じ結果になることを確認
-        notes1 = [element for element in stream1 if hasattr(element, "pitch")]
-        notes2 = [element for element in stream2 if hasattr(element, "pitch")]
+        count1 = sum(1 for element in stream1 if isinstance(element, note.Note))
+        count2 = sum(1 for element in stream2 if isinstance(element, note.Note))
 
-        assert len(notes1) == len(notes2)
+        assert count1 == count2
 
 
 if __name__ == "__main__":
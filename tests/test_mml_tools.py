@@ -3,137 +3,89 @@
 MMLツールのテストコード
 """
 
+import io
 import pytest
-import tempfile
 import os
-from unittest.mock import Mock, patch
-from src.mml_tools import mml_to_midi, play_midi, play_mml, validate_mml, list_midi_devices
+from unittest.mock import DEFAULT, patch
 
+# 切り詰めテスト用の長いMML（モジュール読み込み時に一度だけ構築）
+LONG_MML = "C" * 150
 
-class TestMMLTools:
-    """MMLツールのテストクラス"""
-
-    def test_mml_to_midi_success(self):
-        """MML to MIDI変換の成功テスト"""
-        with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-
-        try:
-            params = {"mml_text": "CDEFGAB", "output_path": tmp_path}
-
-            result = mml_to_midi(params)
-
-            # 成功結果を確認
-            assert "isError" not in result
-            assert len(result["content"]) == 1
-            assert "変換しました" in result["content"][0]["text"]
-
-            # ファイルが作成されることを確認
-            assert os.path.exists(tmp_path)
-            assert os.path.getsize(tmp_path) > 0
 
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+@pytest.fixture(scope="session")
+def mml():
+    """src.mml_toolsモジュールを遅延インポートして返します
 
-    def test_mml_to_midi_missing_params(self):
-        """MML to MIDI変換のパラメータ不足テスト"""
-        # mml_textが不足
-        params = {"output_path": "test.mid"}
-        result = mml_to_midi(params)
+    モジュールスコープでインポートすると収集時点で重い依存の
+    読み込みが走るため、最初に必要になったテストまで遅らせます。
+    """
+    import src.mml_tools
 
-        assert result["isError"] is True
-        assert "mml_textパラメータが必要" in result["content"][0]["text"]
-
-        # output_pathが不足
-        params = {"mml_text": "CDEFG"}
-        result = mml_to_midi(params)
+    return src.mml_tools
 
-        assert result["isError"] is True
-        assert "output_pathパラメータが必要" in result["content"][0]["text"]
 
-    def test_mml_to_midi_invalid_mml(self):
-        """MML to MIDI変換の不正MMLテスト"""
-        with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
+@pytest.fixture(scope="class")
+def mml_mocks():
+    """クラス全体で共有するMMLProcessor/MIDIPlayerのモック
 
-        try:
-            params = {
-                "mml_text": "CDEFGABX",  # Xは不正な文字
-                "output_path": tmp_path,
-            }
+    テストごとにpatchを張り直す代わりに、クラス単位で一度だけ
+    差し替えてモックを使い回します（リセットは各テスト前に行う）。
+    """
+    with patch.multiple("src.mml_tools", MMLProcessor=DEFAULT, MIDIPlayer=DEFAULT) as mocks:
+        yield mocks["MMLProcessor"], mocks["MIDIPlayer"]
 
-            result = mml_to_midi(params)
 
-            # エラー結果を確認
-            assert result["isError"] is True
-            assert "エラー" in result["content"][0]["text"]
+class TestMMLToolsMocked:
+    """MMLツールのテストクラス（モック使用）"""
 
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(self, mml, mml_mocks):
+        """各テストの前にモックの呼び出し履歴と設定をリセットします"""
+        mock_processor_class, mock_player_class = mml_mocks
+        mock_processor_class.reset_mock(return_value=True, side_effect=True)
+        mock_player_class.reset_mock(return_value=True, side_effect=True)
+        # モックインスタンスをキーに持つ変換・検証キャッシュも空にする
+        # （前のテストの結果が同一MML文字列で返らないようにする）
+        mml._mml_to_midi_cached.cache_clear()
+        mml._multitrack_to_midi_cached.cache_clear()
+        mml._validate_mml_cached.cache_clear()
+        self.mock_processor_class = mock_processor_class
+        self.mock_player_class = mock_player_class
+        yield
 
-    @patch("src.mml_tools.MIDIPlayer")
-    def test_play_midi_success(self, mock_player_class):
+    def test_play_midi_success(self, mml, tmp_path, canonical_midi_bytes):
         """MIDI演奏の成功テスト"""
         # モックの設定
-        mock_player = Mock()
+        mock_player = self.mock_player_class.return_value
         mock_player.get_device_info.return_value = {"current_device": "テストデバイス", "is_playing": True}
-        mock_player_class.return_value = mock_player
-
-        # テンポラリMIDIファイルを作成
-        with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            # 簡単なMIDIデータを書き込み
-            tmp_file.write(b"MThd\x00\x00\x00\x06\x00\x00\x00\x01\x00\x60")
-
-        try:
-            params = {"midi_path": tmp_path}
-            result = play_midi(params)
-
-            # 成功結果を確認
-            assert "isError" not in result
-            assert "演奏を開始しました" in result["content"][0]["text"]
 
-            # MIDIプレイヤーが呼び出されることを確認
-            mock_player_class.assert_called_once_with(device_name=None)
-            mock_player.play_midi_file.assert_called_once_with(tmp_path)
+        # 変換済みの正規MIDIバイト列をそのまま書き出す（変換の再実行はしない）
+        midi_path = str(tmp_path / "test.mid")
+        with open(midi_path, "wb") as midi_file:
+            midi_file.write(canonical_midi_bytes)
 
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        params = {"midi_path": midi_path}
+        result = mml.play_midi(params)
 
-    def test_play_midi_file_not_found(self):
-        """MIDI演奏のファイル未発見テスト"""
-        params = {"midi_path": "nonexistent.mid"}
-        result = play_midi(params)
-
-        assert result["isError"] is True
-        assert "見つかりません" in result["content"][0]["text"]
-
-    def test_play_midi_missing_params(self):
-        """MIDI演奏のパラメータ不足テスト"""
-        params = {}
-        result = play_midi(params)
+        # 成功結果を確認
+        assert "isError" not in result
+        assert "演奏を開始しました" in result["content"][0]["text"]
 
-        assert result["isError"] is True
-        assert "midi_pathパラメータが必要" in result["content"][0]["text"]
+        # MIDIプレイヤーが呼び出されることを確認
+        self.mock_player_class.assert_called_once_with(device_name=None)
+        mock_player.play_midi_file.assert_called_once_with(midi_path)
 
-    @patch("src.mml_tools.MIDIPlayer")
-    @patch("src.mml_tools.MMLProcessor")
-    def test_play_mml_success(self, mock_processor_class, mock_player_class):
+    def test_play_mml_success(self, mml):
         """MML演奏の成功テスト"""
         # モックの設定
-        mock_processor = Mock()
+        mock_processor = self.mock_processor_class.return_value
         mock_processor.mml_to_midi_data.return_value = b"mock_midi_data"
-        mock_processor_class.return_value = mock_processor
 
-        mock_player = Mock()
+        mock_player = self.mock_player_class.return_value
         mock_player.get_device_info.return_value = {"current_device": "テストデバイス", "is_playing": True}
-        mock_player_class.return_value = mock_player
 
         params = {"mml_text": "CDEFGAB"}
-        result = play_mml(params)
+        result = mml.play_mml(params)
 
         # 成功結果を確認
         assert "isError" not in result
@@ -143,24 +95,14 @@ class TestMMLTools:
         mock_processor.mml_to_midi_data.assert_called_once_with("CDEFGAB")
         mock_player.play_midi_data.assert_called_once_with(b"mock_midi_data")
 
-    def test_play_mml_missing_params(self):
-        """MML演奏のパラメータ不足テスト"""
-        params = {}
-        result = play_mml(params)
-
-        assert result["isError"] is True
-        assert "mml_textパラメータが必要" in result["content"][0]["text"]
-
-    @patch("src.mml_tools.MMLProcessor")
-    def test_validate_mml_valid(self, mock_processor_class):
+    def test_validate_mml_valid(self, mml):
         """MML検証の正常テスト"""
         # モックの設定
-        mock_processor = Mock()
+        mock_processor = self.mock_processor_class.return_value
         mock_processor.validate_mml_syntax.return_value = (True, "MML構文は正常です")
-        mock_processor_class.return_value = mock_processor
 
         params = {"mml_text": "CDEFGAB"}
-        result = validate_mml(params)
+        result = mml.validate_mml(params)
 
         # 成功結果を確認
         assert result.get("isError") is not True
@@ -168,39 +110,31 @@ class TestMMLTools:
 
         mock_processor.validate_mml_syntax.assert_called_once_with("CDEFGAB")
 
-    @patch("src.mml_tools.MMLProcessor")
-    def test_validate_mml_invalid(self, mock_processor_class):
+    def test_validate_mml_invalid(self, mml):
         """MML検証の異常テスト"""
         # モックの設定
-        mock_processor = Mock()
-        mock_processor.validate_mml_syntax.return_value = (False, "不明なMMLコマンド")
-        mock_processor_class.return_value = mock_processor
+        mock_processor = self.mock_processor_class.return_value
+        mock_processor.validate_mml_syntax.return_value = (False, "テンポ指定が不正です")
 
-        params = {"mml_text": "CDEFGABX"}
-        result = validate_mml(params)
+        # 文字集合は正当だが構文不正な入力（文字集合の高速経路を通らない）
+        params = {"mml_text": "T"}
+        result = mml.validate_mml(params)
 
         # エラー結果を確認
         assert result["isError"] is True
+        assert result["code"] == mml.ErrorCode.INVALID_MML
         assert "✗ エラー" in result["content"][0]["text"]
 
-    def test_validate_mml_missing_params(self):
-        """MML検証のパラメータ不足テスト"""
-        params = {}
-        result = validate_mml(params)
-
-        assert result["isError"] is True
-        assert "mml_textパラメータが必要" in result["content"][0]["text"]
+        # プロセッサへ委譲されることを確認
+        mock_processor.validate_mml_syntax.assert_called_once_with("T")
 
-    @patch("src.mml_tools.MIDIPlayer")
-    def test_list_midi_devices_with_devices(self, mock_player_class):
+    def test_list_midi_devices_with_devices(self, mml):
         """MIDIデバイス一覧の取得テスト（デバイスあり）"""
         # モックの設定
-        mock_player = Mock()
-        mock_player.get_available_devices.return_value = ["デバイス1", "デバイス2", "デバイス3"]
-        mock_player_class.return_value = mock_player
+        self.mock_player_class.list_devices_static.return_value = ["デバイス1", "デバイス2", "デバイス3"]
 
         params = {}
-        result = list_midi_devices(params)
+        result = mml.list_midi_devices(params)
 
         # 成功結果を確認
         assert "isError" not in result
@@ -209,56 +143,120 @@ class TestMMLTools:
         assert "デバイス2" in result["content"][0]["text"]
         assert "デバイス3" in result["content"][0]["text"]
 
-    @patch("src.mml_tools.MIDIPlayer")
-    def test_list_midi_devices_no_devices(self, mock_player_class):
+    def test_list_midi_devices_no_devices(self, mml):
         """MIDIデバイス一覧の取得テスト（デバイスなし）"""
         # モックの設定
-        mock_player = Mock()
-        mock_player.get_available_devices.return_value = []
-        mock_player_class.return_value = mock_player
+        self.mock_player_class.list_devices_static.return_value = []
 
         params = {}
-        result = list_midi_devices(params)
+        result = mml.list_midi_devices(params)
 
         # 成功結果を確認
         assert "isError" not in result
         assert "利用可能なMIDIデバイスがありません" in result["content"][0]["text"]
         assert "仮想MIDIポート" in result["content"][0]["text"]
 
-    @patch("src.mml_tools.MIDIPlayer")
-    def test_list_midi_devices_error(self, mock_player_class):
+    def test_list_midi_devices_error(self, mml):
         """MIDIデバイス一覧の取得エラーテスト"""
         # モックの設定
-        mock_player_class.side_effect = Exception("テストエラー")
+        self.mock_player_class.list_devices_static.side_effect = Exception("テストエラー")
 
         params = {}
-        result = list_midi_devices(params)
+        result = mml.list_midi_devices(params)
 
         # エラー結果を確認
         assert result["isError"] is True
-        assert "エラー" in result["content"][0]["text"]
+        assert result["code"] == mml.ErrorCode.INTERNAL
 
-    def test_long_mml_text_truncation(self):
-        """長いMMLテキストの切り詰めテスト"""
-        # 100文字を超えるMMLテキスト
-        long_mml = "C" * 150
 
-        with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
+class TestMMLTools:
+    """MMLツールのテストクラス（実処理パス）"""
+
+    @pytest.mark.slow
+    def test_mml_to_midi_success(self, mml, tmp_path):
+        """MML to MIDI変換の成功テスト"""
+        output_path = str(tmp_path / "out.mid")
+        params = {"mml_text": "CDEFGAB", "output_path": output_path}
+
+        result = mml.mml_to_midi(params)
+
+        # 成功結果を確認
+        assert "isError" not in result
+        assert len(result["content"]) == 1
+        assert "変換しました" in result["content"][0]["text"]
+
+        # ファイルが作成されることを確認（statは1回で済ませる）
+        assert os.stat(output_path).st_size > 0
+
+    @pytest.mark.parametrize(
+        "handler_name, params, code_name",
+        [
+            ("mml_to_midi", {"output_path": "test.mid"}, "MML_TEXT_REQUIRED"),
+            ("mml_to_midi", {"mml_text": "CDEFG"}, "OUTPUT_PATH_REQUIRED"),
+            ("play_midi", {}, "MIDI_PATH_REQUIRED"),
+            ("play_mml", {}, "MML_TEXT_REQUIRED"),
+            ("validate_mml", {}, "MML_TEXT_REQUIRED"),
+        ],
+    )
+    def test_missing_params(self, mml, handler_name, params, code_name):
+        """各ツールのパラメータ不足テスト（テーブル駆動）
+
+        収集時にモジュールを触らないよう、ハンドラとエラーコードは
+        名前で指定してテスト本体で解決します。
+        """
+        result = getattr(mml, handler_name)(params)
+
+        assert result["isError"] is True
+        assert result["code"] == getattr(mml.ErrorCode, code_name)
+
+    def test_mml_to_midi_stream(self, mml):
+        """インメモリ変換ヘルパーのテスト（ディスクI/Oなし）"""
+        buf = io.BytesIO()
+        written = mml._mml_to_midi_stream("CDEFGAB", buf)
 
-        try:
-            params = {"mml_text": long_mml, "output_path": tmp_path}
+        # バッファに正しいMIDIデータが書き込まれることを確認
+        assert written > 0
+        assert buf.tell() == written
+        assert buf.getvalue()[:4] == b"MThd"
 
-            result = mml_to_midi(params)
+    @pytest.mark.slow
+    def test_mml_to_midi_invalid_mml(self, mml, tmp_path):
+        """MML to MIDI変換の不正MMLテスト"""
+        output_path = str(tmp_path / "out.mid")
+        params = {
+            "mml_text": "CDEFGABX",  # Xは不正な文字
+            "output_path": output_path,
+        }
+
+        result = mml.mml_to_midi(params)
+
+        # エラー結果を確認
+        assert result["isError"] is True
+        assert result["code"] == mml.ErrorCode.INVALID_MML
+
+        # 変換失敗時に出力ファイルが作られていないことを確認
+        assert not os.path.exists(output_path)
+
+    def test_play_midi_file_not_found(self, mml):
+        """MIDI演奏のファイル未発見テスト"""
+        params = {"midi_path": "nonexistent.mid"}
+        result = mml.play_midi(params)
+
+        assert result["isError"] is True
+        assert result["code"] == mml.ErrorCode.FILE_NOT_FOUND
+
+    @pytest.mark.slow
+    def test_long_mml_text_truncation(self, mml, tmp_path):
+        """長いMMLテキストの切り詰めテスト"""
+        # 100文字を超えるMMLテキスト（モジュールスコープで構築済み）
+        params = {"mml_text": LONG_MML, "output_path": str(tmp_path / "out.mid")}
 
-            # 結果にテキストが切り詰められていることを確認
-            result_text = result["content"][0]["text"]
-            assert "..." in result_text
-            assert len([line for line in result_text.split("\n") if "MML:" in line][0]) < len(f"入力MML: {long_mml}")
+        result = mml.mml_to_midi(params)
 
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        # 結果にテキストが切り詰められていることを確認
+        result_text = result["content"][0]["text"]
+        assert "..." in result_text
+        assert len([line for line in result_text.split("\n") if "MML:" in line][0]) < len(f"入力MML: {LONG_MML}")
 
 
 if __name__ == "__main__":